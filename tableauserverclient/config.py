@@ -23,5 +23,16 @@ class Config:
     def PAGE_SIZE(self):
         return int(os.getenv("TSC_PAGE_SIZE", 100))
 
+    # Parse responses with lxml, installed with the [fast] extra. Off unless explicitly enabled.
+    @property
+    def USE_LXML(self):
+        return os.getenv("TSC_USE_LXML", "").lower() in ("1", "true", "yes")
+
+    # Parse responses with the C ElementTree parser instead of defusedxml. Only for servers you trust: plain
+    # expat still expands internal entities. Off unless explicitly enabled.
+    @property
+    def TRUSTED_PARSE(self):
+        return os.getenv("TSC_TRUSTED_PARSE", "").lower() in ("1", "true", "yes")
+
 
 config = Config()
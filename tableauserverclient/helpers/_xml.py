@@ -0,0 +1,80 @@
+import re
+import xml.etree.ElementTree as ET
+
+import defusedxml.ElementTree as defused_ET
+from defusedxml import EntitiesForbidden
+
+from tableauserverclient.config import config
+
+# lxml is an optional extra (pip install tableauserverclient[fast]) and is only used when TSC_USE_LXML is set, so
+# having it installed as some other package's dependency does not change the parser. lxml parses with network
+# access turned off, but even with resolve_entities=False it still expands internal entities when building a tree
+# (and leaves them as literal "&name;" text when driving a target), so entity declarations are rejected up front to
+# match defusedxml's EntitiesForbidden.
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+# defusedxml hooks entity declarations by swapping in the pure-Python XMLParser, which roughly doubles parse
+# time on large listings. Setting TSC_TRUSTED_PARSE hands responses to the C-accelerated ElementTree parser instead.
+# Only do that for responses from a server you trust: plain expat still expands internal entities, and its
+# amplification guard (expat 2.4.1+) only activates past 8 MiB of expanded output, so a small response with
+# nested <!ENTITY> declarations can still inflate to megabytes.
+
+
+def _use_lxml() -> bool:
+    if not config.USE_LXML:
+        return False
+    if lxml_etree is None:
+        raise ImportError("TSC_USE_LXML is set but lxml is not installed: pip install tableauserverclient[fast]")
+    return True
+
+
+_XML_ENCODING_RE = re.compile(r"""\s*<\?xml[^>]*?encoding\s*=\s*["']([\w.-]+)["']""")
+_ENTITY_DECLARATION_RE = re.compile(rb"<!ENTITY\s+(?:%\s+)?([^\s>]+)")
+
+
+def _lxml_parser(target=None):
+    return lxml_etree.XMLParser(target=target, resolve_entities=False, no_network=True, huge_tree=False)
+
+
+def _lxml_input(xml) -> bytes:
+    # lxml refuses str input that carries an encoding declaration, so encode it back to the declared encoding.
+    # ElementTree and defusedxml take str as-is.
+    if isinstance(xml, bytes):
+        return xml
+    declaration = _XML_ENCODING_RE.match(xml)
+    encoding = declaration.group(1) if declaration is not None else "utf-8"
+    return xml.encode(encoding, "xmlcharrefreplace")
+
+
+def _forbid_entities(xml: bytes) -> None:
+    # Entity declarations can only live in a DTD; anything matching inside a comment or CDATA is rejected too.
+    declaration = _ENTITY_DECLARATION_RE.search(xml)
+    if declaration is not None:
+        raise EntitiesForbidden(declaration.group(1).decode("utf-8", "replace"), None, None, None, None, None)
+
+
+def fast_fromstring(xml):
+    if _use_lxml():
+        xml = _lxml_input(xml)
+        _forbid_entities(xml)
+        return lxml_etree.fromstring(xml, parser=_lxml_parser())
+    if config.TRUSTED_PARSE:
+        return ET.fromstring(xml)
+    return defused_ET.fromstring(xml)
+
+
+def parse_with_target(xml, target):
+    """Feeds xml to a parser driving the given target object instead of building a tree; returns target.close()."""
+    if _use_lxml():
+        xml = _lxml_input(xml)
+        _forbid_entities(xml)
+        parser = _lxml_parser(target)
+    elif config.TRUSTED_PARSE:
+        parser = ET.XMLParser(target=target)
+    else:
+        parser = defused_ET.DefusedXMLParser(target=target)
+    parser.feed(xml)
+    return parser.close()
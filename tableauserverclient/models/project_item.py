@@ -1,11 +1,79 @@
-import logging
-import xml.etree.ElementTree as ET
-from typing import Optional
-
-from defusedxml.ElementTree import fromstring
+from functools import lru_cache
+from typing import ClassVar, Optional
+from weakref import WeakValueDictionary
 
+from tableauserverclient.helpers._xml import fast_fromstring, parse_with_target
 from tableauserverclient.models.exceptions import UnpopulatedPropertyError
-from tableauserverclient.models.property_decorators import property_is_enum, property_not_empty
+from tableauserverclient.namespace import NAMESPACE_RE
+
+# Keyed by the Resource values the endpoints pass in, so the common case needs no normalisation.
+_DEFAULT_PERMISSIONS_ATTRS = {
+    "workbook": "_default_workbook_permissions",
+    "datasource": "_default_datasource_permissions",
+    "flow": "_default_flow_permissions",
+    "lens": "_default_lens_permissions",
+    "datarole": "_default_datarole_permissions",
+    "metric": "_default_metric_permissions",
+    "virtualConnection": "_default_virtualconnection_permissions",
+    "virtualconnection": "_default_virtualconnection_permissions",
+    "database": "_default_database_permissions",
+    "table": "_default_table_permissions",
+}
+
+
+@lru_cache(maxsize=8)
+def _qname(namespace_uri: str, local_name: str) -> str:
+    return f"{{{namespace_uri}}}{local_name}"
+
+
+class _ProjectTarget:
+    # Parser target for project listings. It has no data() method, so the parser never calls back for text.
+    def __init__(self, project_tag, owner_tag):
+        self._project_tag = project_tag
+        self._owner_tag = owner_tag
+        self._project = None
+        self._owner_id = None
+        self.projects = []
+
+    # The C parser hands out one str object per distinct tag name, but not the one we built, so an identity test
+    # against our own constant would never match. Once a tag has matched by equality we keep the parser's object
+    # instead, and every later == on that tag short-circuits on identity rather than comparing characters.
+    def start(self, tag, attrib):
+        if tag == self._project_tag:
+            self._project_tag = tag
+            self._project = attrib
+            self._owner_id = None
+        elif tag == self._owner_tag and self._project is not None:
+            self._owner_tag = tag
+            self._owner_id = attrib.get("id")
+
+    def end(self, tag):
+        if tag == self._project_tag:
+            attrib = self._project
+            self.projects.append(
+                (
+                    attrib.get("id"),
+                    attrib.get("name"),
+                    attrib.get("description"),
+                    attrib.get("contentPermissions"),
+                    attrib.get("parentProjectId"),
+                    self._owner_id,
+                )
+            )
+            self._project = None
+
+    def close(self):
+        return self.projects
+
+
+def _default_permissions_property(attr: str) -> property:
+    def getter(self):
+        permissions = getattr(self, attr)
+        if permissions is None:
+            raise UnpopulatedPropertyError(self.ERROR_MSG)
+        return permissions()
+
+    return property(getter)
 
 
 class ProjectItem:
@@ -47,6 +115,30 @@ class ProjectItem:
 
     """
 
+    __slots__ = (
+        "_id",
+        "_name",
+        "description",
+        "_content_permissions",
+        "parent_id",
+        "_samples",
+        "_owner_id",
+        "_permissions",
+        "_default_workbook_permissions",
+        "_default_datasource_permissions",
+        "_default_flow_permissions",
+        "_default_lens_permissions",
+        "_default_datarole_permissions",
+        "_default_metric_permissions",
+        "_default_virtualconnection_permissions",
+        "_default_database_permissions",
+        "_default_table_permissions",
+        "__weakref__",
+    )
+
+    # Items built with use_cache=True, keyed by project id. Entries disappear once callers drop the item.
+    _cache: ClassVar["WeakValueDictionary[str, ProjectItem]"] = WeakValueDictionary()
+
     ERROR_MSG = "Project item must be populated with permissions first."
 
     class ContentPermissions:
@@ -55,9 +147,9 @@ class ProjectItem:
         LockedToProjectWithoutNested: str = "LockedToProjectWithoutNested"
 
     def __repr__(self):
-        return "<Project {} {} parent={} permissions={}>".format(
-            self._id, self.name, self.parent_id or "None (Top level)", self.content_permissions or "Not Set"
-        )
+        parent = self.parent_id or "None (Top level)"
+        permissions = self._content_permissions or "Not Set"
+        return f"<Project {self._id} {self._name} parent={parent} permissions={permissions}>"
 
     def __init__(
         self,
@@ -92,8 +184,10 @@ class ProjectItem:
         return self._content_permissions
 
     @content_permissions.setter
-    @property_is_enum(ContentPermissions)
     def content_permissions(self, value: Optional[str]) -> None:
+        if value is not None and value not in _CONTENT_PERMISSIONS_VALUES:
+            error = f"Invalid value: {value}. content_permissions must be of type ContentPermissions."
+            raise ValueError(error)
         self._content_permissions = value
 
     @property
@@ -102,59 +196,15 @@ class ProjectItem:
             raise UnpopulatedPropertyError(self.ERROR_MSG)
         return self._permissions()
 
-    @property
-    def default_datasource_permissions(self):
-        if self._default_datasource_permissions is None:
-            raise UnpopulatedPropertyError(self.ERROR_MSG)
-        return self._default_datasource_permissions()
-
-    @property
-    def default_workbook_permissions(self):
-        if self._default_workbook_permissions is None:
-            raise UnpopulatedPropertyError(self.ERROR_MSG)
-        return self._default_workbook_permissions()
-
-    @property
-    def default_flow_permissions(self):
-        if self._default_flow_permissions is None:
-            raise UnpopulatedPropertyError(self.ERROR_MSG)
-        return self._default_flow_permissions()
-
-    @property
-    def default_lens_permissions(self):
-        if self._default_lens_permissions is None:
-            raise UnpopulatedPropertyError(self.ERROR_MSG)
-        return self._default_lens_permissions()
-
-    @property
-    def default_datarole_permissions(self):
-        if self._default_datarole_permissions is None:
-            raise UnpopulatedPropertyError(self.ERROR_MSG)
-        return self._default_datarole_permissions()
-
-    @property
-    def default_metric_permissions(self):
-        if self._default_metric_permissions is None:
-            raise UnpopulatedPropertyError(self.ERROR_MSG)
-        return self._default_metric_permissions()
-
-    @property
-    def default_virtualconnection_permissions(self):
-        if self._default_virtualconnection_permissions is None:
-            raise UnpopulatedPropertyError(self.ERROR_MSG)
-        return self._default_virtualconnection_permissions()
-
-    @property
-    def default_database_permissions(self):
-        if self._default_database_permissions is None:
-            raise UnpopulatedPropertyError(self.ERROR_MSG)
-        return self._default_database_permissions()
-
-    @property
-    def default_table_permissions(self):
-        if self._default_table_permissions is None:
-            raise UnpopulatedPropertyError(self.ERROR_MSG)
-        return self._default_table_permissions()
+    default_datasource_permissions = _default_permissions_property("_default_datasource_permissions")
+    default_workbook_permissions = _default_permissions_property("_default_workbook_permissions")
+    default_flow_permissions = _default_permissions_property("_default_flow_permissions")
+    default_lens_permissions = _default_permissions_property("_default_lens_permissions")
+    default_datarole_permissions = _default_permissions_property("_default_datarole_permissions")
+    default_metric_permissions = _default_permissions_property("_default_metric_permissions")
+    default_virtualconnection_permissions = _default_permissions_property("_default_virtualconnection_permissions")
+    default_database_permissions = _default_permissions_property("_default_database_permissions")
+    default_table_permissions = _default_permissions_property("_default_table_permissions")
 
     @property
     def id(self) -> Optional[str]:
@@ -165,7 +215,7 @@ class ProjectItem:
         return self._name
 
     @name.setter
-    def name(self, value: str) -> None:
+    def name(self, value: Optional[str]) -> None:
         self._name = value
 
     @property
@@ -180,18 +230,23 @@ class ProjectItem:
         return self.name.lower() == "default"
 
     def _parse_common_tags(self, project_xml, ns):
-        if not isinstance(project_xml, ET.Element):
-            project_xml = fromstring(project_xml).find(".//t:project", namespaces=ns)
+        if isinstance(project_xml, (bytes, str)):
+            # Single-project responses carry the <project> directly under the root, so there is no need
+            # for a recursive search.
+            root = fast_fromstring(project_xml)
+            project_tag = _qname(ns["t"], "project")
+            project_xml = root if root.tag == project_tag else root.find(project_tag)
 
         if project_xml is not None:
-            (
-                _,
-                name,
-                description,
-                content_permissions,
-                parent_id,
-            ) = self._parse_element(project_xml)
-            self._set_values(None, name, description, content_permissions, parent_id)
+            attrib = project_xml.attrib
+            self._set_values(
+                None,
+                attrib.get("name"),
+                attrib.get("description"),
+                attrib.get("contentPermissions"),
+                attrib.get("parentProjectId"),
+                None,
+            )
         return self
 
     def _set_values(self, project_id, name, description, content_permissions, parent_id, owner_id):
@@ -212,39 +267,104 @@ class ProjectItem:
         self._permissions = permissions
 
     def _set_default_permissions(self, permissions, content_type):
-        attr = f"_default_{content_type}_permissions".lower()
-        setattr(
-            self,
-            attr,
-            permissions,
-        )
+        attr = _DEFAULT_PERMISSIONS_ATTRS.get(content_type) or _DEFAULT_PERMISSIONS_ATTRS.get(content_type.lower())
+        if attr is None:
+            supported = ", ".join(_DEFAULT_PERMISSIONS_ATTRS)
+            error = (
+                f"Projects have no default permissions for content type {content_type}. Supported types: {supported}."
+            )
+            raise ValueError(error)
+        setattr(self, attr, permissions)
+
+    @classmethod
+    def from_response(cls, resp, ns, use_cache: bool = False) -> list["ProjectItem"]:
+        """
+        Parses the projects in a server response. With use_cache=True, a
+        project that is still referenced from an earlier call is returned as
+        the same instance, with its fields refreshed from this response;
+        anything populated on it (permissions, local edits to name etc.) is
+        shared with the earlier caller.
+        """
+        # Only the attributes of <project> and its <owner> are used, so feed the response straight to a parser
+        # target instead of building a tree.
+        all_values = parse_with_target(resp, _ProjectTarget(_qname(ns["t"], "project"), _qname(ns["t"], "owner")))
+        construct = cls._cached_construct if use_cache else cls._fast_construct
+        return [construct(*values) for values in all_values]
 
     @classmethod
-    def from_response(cls, resp, ns) -> list["ProjectItem"]:
-        all_project_items = list()
-        parsed_response = fromstring(resp)
-        all_project_xml = parsed_response.findall(".//t:project", namespaces=ns)
+    def from_xml(cls, project_xml, namespace=None, use_cache: bool = False) -> "ProjectItem":
+        if namespace is not None:
+            owner_tag = _qname(namespace["t"], "owner")
+        else:
+            # Without a namespace, the owner lives in whatever namespace the <project> element itself is in.
+            matches = NAMESPACE_RE.match(project_xml.tag)
+            owner_tag = _qname(matches.group(1), "owner") if matches else "owner"
+        construct = cls._cached_construct if use_cache else cls._fast_construct
+        return construct(*cls._parse_element(project_xml, owner_tag))
 
-        for project_xml in all_project_xml:
-            project_item = cls.from_xml(project_xml)
-            all_project_items.append(project_item)
-        return all_project_items
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._cache.clear()
 
     @classmethod
-    def from_xml(cls, project_xml, namespace=None) -> "ProjectItem":
-        project_item = cls()
-        project_item._set_values(*cls._parse_element(project_xml))
+    def _cached_construct(cls, id, name, description, content_permissions, parent_id, owner_id) -> "ProjectItem":
+        project_item = cls._cache.get(id) if id is not None else None
+        if project_item is None:
+            project_item = cls._fast_construct(id, name, description, content_permissions, parent_id, owner_id)
+            if id is not None:
+                cls._cache[id] = project_item
+            return project_item
+
+        project_item._name = name or None
+        project_item.description = description or None
+        project_item._content_permissions = content_permissions or None
+        project_item.parent_id = parent_id or None
+        project_item._owner_id = owner_id or None
         return project_item
 
+    @classmethod
+    def _fast_construct(cls, id, name, description, content_permissions, parent_id, owner_id) -> "ProjectItem":
+        # Values parsed from a server response are already valid, so skip __init__ and the property setters.
+        # Empty strings are stored as None, matching what _set_values does for a freshly constructed item.
+        self = object.__new__(cls)
+        self._id = id
+        self._name = name or None
+        self.description = description or None
+        self._content_permissions = content_permissions or None
+        self.parent_id = parent_id or None
+        self._samples = None
+        self._owner_id = owner_id or None
+
+        self._permissions = None
+        self._default_workbook_permissions = None
+        self._default_datasource_permissions = None
+        self._default_flow_permissions = None
+        self._default_lens_permissions = None
+        self._default_datarole_permissions = None
+        self._default_metric_permissions = None
+        self._default_virtualconnection_permissions = None
+        self._default_database_permissions = None
+        self._default_table_permissions = None
+        return self
+
     @staticmethod
-    def _parse_element(project_xml):
-        id = project_xml.get("id", None)
-        name = project_xml.get("name", None)
-        description = project_xml.get("description", None)
-        content_permissions = project_xml.get("contentPermissions", None)
-        parent_id = project_xml.get("parentProjectId", None)
-        owner_id = None
-        for owner in project_xml:
-            owner_id = owner.get("id", None)
+    def _parse_element(project_xml, owner_tag):
+        attrib = project_xml.attrib
+        id = attrib.get("id")
+        name = attrib.get("name")
+        description = attrib.get("description")
+        content_permissions = attrib.get("contentPermissions")
+        parent_id = attrib.get("parentProjectId")
+        owner_elem = project_xml.find(owner_tag)
+        owner_id = owner_elem.attrib.get("id") if owner_elem is not None else None
 
         return id, name, description, content_permissions, parent_id, owner_id
+
+
+_CONTENT_PERMISSIONS_VALUES = frozenset(
+    (
+        ProjectItem.ContentPermissions.LockedToProject,
+        ProjectItem.ContentPermissions.ManagedByOwner,
+        ProjectItem.ContentPermissions.LockedToProjectWithoutNested,
+    )
+)
@@ -1,6 +1,16 @@
 import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from defusedxml import EntitiesForbidden
 
 import tableauserverclient as TSC
+from tableauserverclient.helpers import _xml as xml_helpers
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
 
 
 class ProjectModelTests(unittest.TestCase):
@@ -14,8 +24,132 @@ class ProjectModelTests(unittest.TestCase):
         project = TSC.ProjectItem("proj")
         with self.assertRaises(ValueError):
             project.content_permissions = "Hello"
+        with self.assertRaises(ValueError):
+            project.content_permissions = "__doc__"
+
+    def test_content_permissions(self):
+        project = TSC.ProjectItem("proj", content_permissions=TSC.ProjectItem.ContentPermissions.LockedToProject)
+        self.assertEqual("LockedToProject", project.content_permissions)
+        project.content_permissions = None
+        self.assertIsNone(project.content_permissions)
 
     def test_parent_id(self):
         project = TSC.ProjectItem("proj")
         project.parent_id = "foo"
         self.assertEqual(project.parent_id, "foo")
+
+    def test_owner_id_ignores_other_children(self):
+        xml = (
+            b'<tsResponse xmlns="http://tableau.com/api"><projects>'
+            b'<project id="p1" name="proj"><owner id="u1" /><contentCounts projectCount="0" /></project>'
+            b"</projects></tsResponse>"
+        )
+        (project,) = TSC.ProjectItem.from_response(xml, {"t": "http://tableau.com/api"})
+        self.assertEqual("p1", project.id)
+        self.assertEqual("u1", project.owner_id)
+
+    def test_from_xml_without_namespace(self):
+        for namespace in ("http://tableau.com/api", "http://tableausoftware.com/api"):
+            project_xml = ET.fromstring(f'<project xmlns="{namespace}" id="p1"><owner id="u1" /></project>')
+            project = TSC.ProjectItem.from_xml(project_xml)
+            self.assertEqual("u1", project.owner_id)
+
+        project = TSC.ProjectItem.from_xml(ET.fromstring('<project id="p1"><owner id="u1" /></project>'))
+        self.assertEqual("u1", project.owner_id)
+
+    def test_set_default_permissions_unsupported_type(self):
+        project = TSC.ProjectItem("proj")
+        project._set_default_permissions(lambda: [], "VirtualConnection")
+        self.assertEqual([], project.default_virtualconnection_permissions)
+        with self.assertRaisesRegex(ValueError, "view"):
+            project._set_default_permissions(lambda: [], TSC.Resource.View)
+
+    def test_parse_common_tags(self):
+        xml = (
+            b'<tsResponse xmlns="http://tableau.com/api">'
+            b'<project id="p1" name="renamed" description="desc" contentPermissions="LockedToProject" />'
+            b"</tsResponse>"
+        )
+        project = TSC.ProjectItem("proj")
+        project._parse_common_tags(xml, {"t": "http://tableau.com/api"})
+        self.assertIsNone(project.id)
+        self.assertEqual("renamed", project.name)
+        self.assertEqual("desc", project.description)
+        self.assertEqual("LockedToProject", project.content_permissions)
+
+    def test_from_response_trusted_parser(self):
+        xml = b'<tsResponse xmlns="http://tableau.com/api"><projects><project id="p1" name="proj" /></projects></tsResponse>'
+        with mock.patch.dict("os.environ", {"TSC_USE_LXML": "", "TSC_TRUSTED_PARSE": "1"}):
+            (project,) = TSC.ProjectItem.from_response(xml, {"t": "http://tableau.com/api"})
+        self.assertEqual("p1", project.id)
+        self.assertEqual("proj", project.name)
+
+    ENTITY_XML = (
+        b'<?xml version="1.0"?><!DOCTYPE tsResponse [<!ENTITY a "aaaaaaaaaa">]>'
+        b'<tsResponse xmlns="http://tableau.com/api"><projects><project id="&a;" /></projects></tsResponse>'
+    )
+
+    def test_from_response_rejects_entities(self):
+        environ = {"TSC_USE_LXML": "", "TSC_TRUSTED_PARSE": ""}
+        with mock.patch.dict("os.environ", environ), self.assertRaises(EntitiesForbidden):
+            TSC.ProjectItem.from_response(self.ENTITY_XML, {"t": "http://tableau.com/api"})
+
+    @unittest.skipUnless(lxml_etree, "lxml is not installed")
+    def test_lxml_rejects_entities(self):
+        with mock.patch.dict("os.environ", {"TSC_USE_LXML": "1"}):
+            with self.assertRaises(EntitiesForbidden):
+                TSC.ProjectItem.from_response(self.ENTITY_XML, {"t": "http://tableau.com/api"})
+            with self.assertRaises(EntitiesForbidden):
+                TSC.ProjectItem("proj")._parse_common_tags(self.ENTITY_XML, {"t": "http://tableau.com/api"})
+
+    @unittest.skipUnless(lxml_etree, "lxml is not installed")
+    def test_lxml_parser(self):
+        ns = {"t": "http://tableau.com/api"}
+        xml = (
+            b'<tsResponse xmlns="http://tableau.com/api"><projects>'
+            b'<project id="p1" name="proj" contentPermissions="LockedToProject"><owner id="u1" /></project>'
+            b"</projects></tsResponse>"
+        )
+        with mock.patch.dict("os.environ", {"TSC_USE_LXML": "1"}):
+            self.assertIsInstance(xml_helpers.fast_fromstring(xml), lxml_etree._Element)
+
+            (project,) = TSC.ProjectItem.from_response(xml, ns)
+            self.assertEqual("p1", project.id)
+            self.assertEqual("u1", project.owner_id)
+
+            project = TSC.ProjectItem("other")
+            project._parse_common_tags(xml.replace(b"<projects>", b"").replace(b"</projects>", b""), ns)
+            self.assertEqual("proj", project.name)
+            self.assertEqual("LockedToProject", project.content_permissions)
+
+    def test_str_response_with_declared_encoding(self):
+        ns = {"t": "http://tableau.com/api"}
+        xml = (
+            '<?xml version="1.0" encoding="ISO-8859-1"?>'
+            '<tsResponse xmlns="http://tableau.com/api"><project id="p1" name="café" /></tsResponse>'
+        )
+        backends = [{"TSC_USE_LXML": "", "TSC_TRUSTED_PARSE": ""}, {"TSC_USE_LXML": "", "TSC_TRUSTED_PARSE": "1"}]
+        if lxml_etree:
+            backends.append({"TSC_USE_LXML": "1"})
+        for environ in backends:
+            with self.subTest(**environ), mock.patch.dict("os.environ", environ):
+                (project,) = TSC.ProjectItem.from_response(xml, ns)
+                self.assertEqual("café", project.name)
+                project = TSC.ProjectItem("proj")._parse_common_tags(xml, ns)
+                self.assertEqual("café", project.name)
+
+    def test_from_response_cache(self):
+        self.addCleanup(TSC.ProjectItem.clear_cache)
+        ns = {"t": "http://tableau.com/api"}
+        xml = b'<tsResponse xmlns="http://tableau.com/api"><projects><project id="p1" name="{}" /></projects></tsResponse>'
+        (first,) = TSC.ProjectItem.from_response(xml.replace(b"{}", b"old"), ns, use_cache=True)
+        (second,) = TSC.ProjectItem.from_response(xml.replace(b"{}", b"new"), ns, use_cache=True)
+        self.assertIs(first, second)
+        self.assertEqual("new", first.name)
+
+        (uncached,) = TSC.ProjectItem.from_response(xml, ns)
+        self.assertIsNot(first, uncached)
+
+        TSC.ProjectItem.clear_cache()
+        (third,) = TSC.ProjectItem.from_response(xml, ns, use_cache=True)
+        self.assertIsNot(first, third)